@@ -0,0 +1,68 @@
+# cython: language_level=3
+"""Быстрый токенизатор для text_analyzer (необязательное C-расширение).
+
+Для строк с внутренним представлением UCS1 (Latin-1) слова выделяются
+одним проходом по байтовому буферу через C-API CPython, без участия
+байткода Python и движка re. Классификация символов и приведение к
+нижнему регистру выполняются по двум таблицам на 256 элементов,
+заполняемым при импорте модуля.
+
+Сборка (модуль не собирается автоматически):
+
+    cythonize -i _tokenizer.pyx
+
+При отсутствии собранного модуля text_analyzer прозрачно использует re.
+"""
+
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+
+cdef extern from "Python.h":
+    ctypedef unsigned char Py_UCS1
+    int PyUnicode_KIND(object o)
+    int PyUnicode_1BYTE_KIND
+    Py_UCS1 *PyUnicode_1BYTE_DATA(object o)
+    Py_ssize_t PyUnicode_GET_LENGTH(object o)
+    object PyUnicode_FromKindAndData(int kind, const void *buffer, Py_ssize_t size)
+
+cdef Py_UCS1[256] _is_letter
+cdef Py_UCS1[256] _lower
+
+cdef int _code
+for _code in range(256):
+    _char = chr(_code)
+    _is_letter[_code] = 1 if _char.isalpha() else 0
+    _lowered = _char.lower()
+    # str.lower не выводит ни один символ Latin-1 за пределы UCS1 и не удлиняет
+    # строку (это свойство casefold: например, U+00B5 -> U+03BC), поэтому ветка
+    # с исходным кодом — чисто защитная и на практике недостижима
+    _lower[_code] = ord(_lowered) if len(_lowered) == 1 and ord(_lowered) < 256 else _code
+
+
+def process_ucs1(str text):
+    """Токенизация UCS1-строки; возвращает None, если представление шире UCS1."""
+    if PyUnicode_KIND(text) != PyUnicode_1BYTE_KIND:
+        return None
+
+    cdef const Py_UCS1 *data = PyUnicode_1BYTE_DATA(text)
+    cdef Py_ssize_t n = PyUnicode_GET_LENGTH(text)
+    cdef Py_UCS1 *scratch = <Py_UCS1 *> PyMem_Malloc(n if n > 0 else 1)
+    if scratch == NULL:
+        raise MemoryError()
+
+    cdef list words = []
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t length
+    try:
+        while i < n:
+            if _is_letter[data[i]]:
+                length = 0
+                while i < n and _is_letter[data[i]]:
+                    scratch[length] = _lower[data[i]]
+                    length += 1
+                    i += 1
+                words.append(PyUnicode_FromKindAndData(PyUnicode_1BYTE_KIND, scratch, length))
+            else:
+                i += 1
+        return words
+    finally:
+        PyMem_Free(scratch)
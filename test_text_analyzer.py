@@ -3,6 +3,7 @@ from collections import Counter
 from io import StringIO
 import sys
 import os
+import text_analyzer
 from text_analyzer import TextProcessor, WordCounter, FileWordsFinder, InMemoryWordsFinder
 
 
@@ -118,6 +119,35 @@ class TestWordCounter(unittest.TestCase):
         self.counter.add_words("file1.txt", ["hello"])
         self.assertEqual(self.counter.get_all_words()["file1.txt"]["hello"], 3)
 
+    def test_update_words_accepts_iterator(self):
+        self.counter.update_words("file1.txt", iter(["hello", "world", "hello"]))
+        self.assertEqual(self.counter.get_all_words()["file1.txt"]["hello"], 2)
+        self.assertEqual(self.counter.count_word_occurrences("hello"), {"file1.txt": 2})
+
+    def test_words_for_prefix(self):
+        self.counter.update_words("file1.txt", ["apple", "apricot", "banana"])
+        self.assertEqual(sorted(self.counter.words_for_prefix("file1.txt", "ap")), ["apple", "apricot"])
+        self.assertEqual(sorted(self.counter.words_for_prefix("file1.txt", None)),
+                         ["apple", "apricot", "banana"])
+        self.assertEqual(list(self.counter.words_for_prefix("file1.txt", "z")), [])
+        self.assertEqual(list(self.counter.words_for_prefix("no_such_file.txt", "a")), [])
+
+    def test_frequency_totals(self):
+        self.counter.update_words("file1.txt", ["hello", "world", "hello"])
+        self.counter.update_words("file2.txt", ["hello"])
+        self.assertEqual(self.counter.frequency_totals(), {"file1.txt": 3, "file2.txt": 1})
+
+    @unittest.skipUnless(text_analyzer.np is not None, "требуется numpy")
+    def test_finalize_matches_counters(self):
+        self.counter.update_words("file1.txt", ["hello", "world", "hello"])
+        self.counter.update_words("file2.txt", ["hello"])
+        self.counter.finalize()
+        self.assertIsNotNone(self.counter.matrix)
+        self.assertEqual(self.counter.frequency_totals(), {"file1.txt": 3, "file2.txt": 1})
+        # Добавление слов делает матрицу устаревшей
+        self.counter.update_words("file1.txt", ["again"])
+        self.assertIsNone(self.counter.matrix)
+
 
 
 class TestFileWordsFinder(unittest.TestCase):
@@ -199,5 +229,56 @@ class TestFileWordsFinder(unittest.TestCase):
         os.remove(large_file)
 
 
+class TestFileWordsFinderMmap(unittest.TestCase):
+    def setUp(self):
+        # Понижаем порог, чтобы mmap-путь срабатывал и на маленьких тестовых файлах
+        self._old_threshold = text_analyzer._MMAP_THRESHOLD
+        text_analyzer._MMAP_THRESHOLD = 0
+        self.test_file = 'mmap_test_file.txt'
+
+    def tearDown(self):
+        text_analyzer._MMAP_THRESHOLD = self._old_threshold
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+
+    def test_mmap_ascii_file(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write("Hello world! This is a test. Hello again.")
+        finder = FileWordsFinder(self.test_file)
+        self.assertEqual(finder.find("hello"), {self.test_file: 2})
+        self.assertEqual(finder.count_all_words()[self.test_file],
+                         Counter(['hello', 'world', 'this', 'is', 'a', 'test', 'hello', 'again']))
+
+    def test_mmap_utf8_file_with_cyrillic(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write("Привет мир! Привет, world!")
+        finder = FileWordsFinder(self.test_file)
+        self.assertEqual(finder.find("привет"), {self.test_file: 2})
+        self.assertEqual(finder.find("world"), {self.test_file: 1})
+
+    def test_mmap_non_utf8_encoding(self):
+        with open(self.test_file, 'w', encoding='cp1251') as f:
+            f.write("Привет мир! Привет!")
+        finder = FileWordsFinder(self.test_file, encoding='cp1251')
+        self.assertEqual(finder.find("привет"), {self.test_file: 2})
+
+    def test_mmap_whitespace_only_file(self):
+        # Файл без слов не должен попадать в результаты, как и при построчном чтении
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write("   \n\t\n   ")
+        finder = FileWordsFinder(self.test_file)
+        self.assertEqual(finder.find("hello"), {})
+        self.assertEqual(finder.count_all_words(), {})
+
+    def test_mmap_matches_streaming_counts(self):
+        with open(self.test_file, 'w', encoding='utf-8') as f:
+            f.write("Hello world " * 200 + "Привет мир " * 100)
+        mapped = FileWordsFinder(self.test_file).count_all_words()[self.test_file]
+        # Возвращаем порог — тот же файл идет построчным путем
+        text_analyzer._MMAP_THRESHOLD = self._old_threshold
+        streamed = FileWordsFinder(self.test_file).count_all_words()[self.test_file]
+        self.assertEqual(mapped, streamed)
+
+
 if __name__ == '__main__':
     unittest.main()
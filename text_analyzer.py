@@ -1,12 +1,82 @@
-import string
+import codecs
 import logging
+import mmap
+import os
 from collections import Counter
-import argparse
-from typing import List, Dict, Optional, Tuple, Any
-from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Any
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import re
 
+try:
+    # re2 (линейный DFA-движок, без бэктрекинга) — необязательная зависимость с re-совместимым API
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+# Предкомпилированное регулярное выражение для выделения слов (только буквы, включая кириллицу)
+_WORD_RE = re.compile(r'[^\W\d_]+')
+if _re2 is not None:
+    # Perl-классы RE2 трактуют \w по-ASCII, поэтому re2 используется только если
+    # проверка подтверждает, что семантика шаблона (включая кириллицу) не меняется
+    try:
+        _word_re2 = _re2.compile(r'[^\W\d_]+')
+        if _word_re2.findall('тест test') == ['тест', 'test']:
+            _WORD_RE = _word_re2
+    except Exception:
+        pass
+
+# Байтовые шаблоны для ASCII-пути по отображенному в память файлу
+_ASCII_WORD_RE = re.compile(rb'[A-Za-z]+')
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+# Файлы крупнее этого порога читаются через mmap, а не построчно
+_MMAP_THRESHOLD = 1 << 20
+
+try:
+    # Собранное C-расширение (см. _tokenizer.pyx) — необязательно
+    from _tokenizer import process_ucs1 as _process_ucs1
+except ImportError:
+    _process_ucs1 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba — необязательная зависимость; без нее используется обычный путь через re
+    _tokenize_ascii = None
+else:
+    @njit(cache=True)
+    def _ascii_word_spans(data):  # pragma: no cover — выполняется только при установленном numba
+        # Один проход по байтовому буферу: выделяем границы подряд идущих букв [a-z]
+        n = data.shape[0]
+        starts = np.empty(n // 2 + 1, dtype=np.int64)
+        ends = np.empty(n // 2 + 1, dtype=np.int64)
+        count = 0
+        i = 0
+        while i < n:
+            if 97 <= data[i] <= 122:
+                start = i
+                i += 1
+                while i < n and 97 <= data[i] <= 122:
+                    i += 1
+                starts[count] = start
+                ends[count] = i
+                count += 1
+            else:
+                i += 1
+        return starts[:count], ends[:count]
+
+    def _tokenize_ascii(text: str) -> List[str]:
+        # Быстрый путь для ASCII-текста: JIT-сканер вместо регулярного выражения
+        data = text.lower().encode('ascii')
+        starts, ends = _ascii_word_spans(np.frombuffer(data, dtype=np.uint8))
+        return [data[start:end].decode('ascii') for start, end in zip(starts, ends)]
+
 
 # Настройка логирования
 def setup_logging(log_level: int) -> None:
@@ -14,47 +84,108 @@ def setup_logging(log_level: int) -> None:
 
 
 class TextProcessor:
-    @lru_cache(maxsize=None)  # Кэширование результатов обработки текста
     def _process_text(self, text: str) -> List[str]:
-        text = text.lower()
-        # Удаляем знаки препинания, кроме дефиса
-        text = text.translate(str.maketrans('', '', string.punctuation.replace('-', '')))
-        # Используем регулярное выражение для фильтрации слов, состоящих только из букв (включая кириллицу)
-        words = re.findall(r'\b[a-zA-Zа-яА-ЯёЁ-]+\b', text)
-        return words
+        if _process_ucs1 is not None:
+            words = _process_ucs1(text)
+            if words is not None:  # None — строка шире UCS1, идем по обычному пути
+                return words
+        if _tokenize_ascii is not None and text.isascii():
+            return _tokenize_ascii(text)
+        # Регистр понижается у каждого найденного слова, а не у копии всего текста
+        return [match.group(0).lower() for match in _WORD_RE.finditer(text)]
+
+    def _process_text_iter(self, text: str) -> Iterator[str]:
+        # Быстрые токенизаторы возвращают готовый список — он выгоднее ленивого regex-пути
+        if _process_ucs1 is not None:
+            words = _process_ucs1(text)
+            if words is not None:  # None — строка шире UCS1, идем по обычному пути
+                return iter(words)
+        if _tokenize_ascii is not None and text.isascii():
+            return iter(_tokenize_ascii(text))
+        # Ленивый вариант _process_text: слова выдаются по одному, без промежуточного списка
+        return (match.group(0).lower() for match in _WORD_RE.finditer(text))
 
 
 class WordCounter:
     def __init__(self) -> None:
         self.all_words: Dict[str, Counter] = {}
+        # Обратный индекс: слово -> {файл: количество вхождений}
+        self.word_index: Dict[str, Dict[str, int]] = {}
+        # Корзины по первой букве: файл -> первая буква -> слова файла
+        self.prefix_index: Dict[str, Dict[str, List[str]]] = {}
+        # SoA-представление счетчиков для векторных агрегаций (см. finalize)
+        self.files: List[str] = []
+        self.vocab: Dict[str, int] = {}
+        self.matrix: Optional[Any] = None
 
     def add_words(self, file_name: str, words: List[str]) -> None:
-        if words is None:
-            raise TypeError("words cannot be None")
-        if not isinstance(words, list):
-            raise TypeError("words must be a list")
+        # Приводим все слова к нижнему регистру, игнорируя неалфавитные;
+        # итерация по None сама возбуждает TypeError, отдельные проверки не нужны
+        self.update_words(file_name, (word.lower() for word in words if word.isalpha()))
+
+    def update_words(self, file_name: str, words: Iterable[str]) -> None:
+        """Добавление уже нормализованных слов (любой итерируемый источник, без промежуточного списка).
 
-        if file_name not in self.all_words:
-            self.all_words[file_name] = Counter()
+        Слова должны быть заранее приведены к нижнему регистру
+        (TextProcessor._process_text это гарантирует).
+        """
+        delta = Counter(words)
+        counter = self.all_words.setdefault(file_name, Counter())
+        counter.update(delta)
+        buckets = self.prefix_index.setdefault(file_name, {})
+        for word, count in delta.items():
+            self.word_index.setdefault(word, {})[file_name] = counter[word]
+            if word and counter[word] == count:  # слово впервые встретилось в этом файле
+                buckets.setdefault(word[0], []).append(word)
+        self.matrix = None  # SoA-представление устарело
+
+    def finalize(self) -> None:
+        """Построение SoA-представления: словарь слово -> столбец и матрица файлы x слова.
+
+        После этого агрегации по всем файлам выполняются одним векторным
+        проходом по непрерывной памяти вместо обхода словарей на уровне
+        Python. Требует установленного numpy.
+        """
+        if np is None:
+            raise RuntimeError("WordCounter.finalize() требует установленного numpy")
+        self.files = list(self.all_words)
+        self.vocab = {word: column for column, word in enumerate(self.word_index)}
+        self.matrix = np.zeros((len(self.files), len(self.vocab)), dtype=np.int32)
+        for row, file_name in enumerate(self.files):
+            for word, count in self.all_words[file_name].items():
+                self.matrix[row, self.vocab[word]] = count
+
+    def frequency_totals(self) -> Dict[str, int]:
+        """Суммарное количество слов по каждому файлу.
+
+        Векторный путь используется только если матрица уже построена явным
+        вызовом finalize() и не устарела: строить ее ради одной агрегации
+        дороже, чем пройтись по счетчикам.
+        """
+        if self.matrix is not None:
+            return dict(zip(self.files, self.matrix.sum(axis=1).tolist()))
+        return {file_name: counter.total() for file_name, counter in self.all_words.items()}
 
-        # Приводим все слова к нижнему регистру перед обновлением
-        lower_case_words = [word.lower() for word in words if word.isalpha()]  # Игнорируем неалфавитные слова
-        self.all_words[file_name].update(lower_case_words)
+    def words_for_prefix(self, file_name: str, starts_with: Optional[str]) -> Iterable[str]:
+        """Слова файла для фильтрации: при заданном префиксе — только корзина его первой буквы."""
+        if starts_with:
+            return self.prefix_index.get(file_name, {}).get(starts_with[0], ())
+        return self.all_words.get(file_name, ())
 
     def get_all_words(self) -> Dict[str, Counter]:
         return self.all_words
 
     def count_word_occurrences(self, word: str) -> Dict[str, int]:
-        word = word.lower()
-        result: Dict[str, int] = {}
-        for file_name, counter in self.all_words.items():
-            count = counter[word]
-            if count > 0:
-                result[file_name] = count
-        return result
+        """Подсчет вхождений слова; ожидается слово в нижнем регистре (см. find у искателей)."""
+        # Ключи word_index заодно служат глобальным словарем: промах обходится
+        # в один поиск по хешу, без создания копии
+        found = self.word_index.get(word)
+        return found.copy() if found else {}
 
 
 class BaseWordsFinder(ABC):
+    word_counter: WordCounter
+
     @abstractmethod
     def find(self, word: str) -> Dict[str, int]:
         pass
@@ -71,6 +202,41 @@ class BaseWordsFinder(ABC):
     def filter_words(self, min_length: int = 0, starts_with: Optional[str] = None) -> Dict[str, List[str]]:
         pass
 
+    def sort_results(self, all_word_counts: Dict[str, Counter], sort_by: str) -> Dict[str, Counter]:
+        """Сортировка результатов по частоте или в алфавитном порядке."""
+        # Обе ветки строят результат одним вызовом dict(sorted(...)) на уровне C,
+        # без поэлементного dict-comprehension; счетчики при этом не копируются
+        if sort_by == 'frequency':
+            # Суммы считаются один раз, а не при каждом сравнении внутри sorted
+            if all_word_counts is self.word_counter.all_words:
+                totals = self.word_counter.frequency_totals()
+            else:
+                totals = {file_name: counter.total() for file_name, counter in all_word_counts.items()}
+            return dict(sorted(all_word_counts.items(), key=lambda item: totals[item[0]], reverse=True))
+        elif sort_by == 'alphabetical':
+            return dict(sorted(all_word_counts.items()))
+        return all_word_counts
+
+    def save_results(self, all_word_counts: Dict[str, Counter], output_file: str, format: str) -> None:
+        """Сохранение результатов в файл."""
+        if format == 'json':
+            payload = {file_name: dict(counter) for file_name, counter in all_word_counts.items()}
+            try:
+                import orjson
+                with open(output_file, 'wb') as f:
+                    f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+            except ImportError:
+                import json
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=4)
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                for file_name, counter in all_word_counts.items():
+                    f.write(f"{file_name}:\n")
+                    for word, count in counter.items():
+                        f.write(f"{word}: {count}\n")
+                    f.write("\n")
+
 
 class FileWordsFinder(BaseWordsFinder):
     def __init__(self, *file_names: str, encoding: str = 'utf-8') -> None:
@@ -88,29 +254,67 @@ class FileWordsFinder(BaseWordsFinder):
 
     def get_all_words(self) -> None:
         """Чтение всех слов из указанных файлов и добавление их в счетчик слов."""
-        for file_name in self.file_names:
-            try:
-                with open(file_name, 'r', encoding=self.encoding) as file:
-                    text = file.read()
-                    if not text.strip():  # Проверка на пустой файл
-                        logging.warning(f"Файл {file_name} пуст.")
-                        continue
-                    words = self.text_processor._process_text(text)
-                    self.word_counter.add_words(file_name, words)
-            except FileNotFoundError:
-                self.handle_error(file_name, "Файл не найден.")
-            except UnicodeDecodeError:
-                self.handle_error(file_name, "Ошибка декодирования.")
-            except Exception as e:
-                self.handle_error(file_name, str(e))
+        if not self.file_names:
+            return
+        # Файлы обрабатываются параллельно: ввод-вывод и работа regex-движка не блокируют друг друга
+        with ThreadPoolExecutor(max_workers=min(32, len(self.file_names))) as executor:
+            counters = list(executor.map(self._count_file, self.file_names))
+        # Результаты сливаются в исходном порядке файлов
+        for file_name, counter in zip(self.file_names, counters):
+            if counter is not None:
+                self.word_counter.update_words(file_name, counter)
+
+    def _count_file(self, file_name: str) -> Optional[Counter]:
+        """Подсчет слов одного файла (выполняется в рабочем потоке)."""
+        try:
+            if os.path.getsize(file_name) > _MMAP_THRESHOLD:
+                counter = self._count_mapped_file(file_name)
+                if not counter:  # Проверка на пустой файл — как и в построчном пути
+                    logging.warning(f"Файл {file_name} пуст.")
+                    return None
+                return counter
+            counter: Counter = Counter()
+            is_empty = True
+            with open(file_name, 'r', encoding=self.encoding) as file:
+                # Читаем построчно: в памяти находится только текущая строка, а не весь файл
+                for line in file:
+                    if is_empty and not line.isspace():
+                        is_empty = False
+                    counter.update(self.text_processor._process_text_iter(line))
+            if is_empty:  # Проверка на пустой файл
+                logging.warning(f"Файл {file_name} пуст.")
+                return None
+            return counter
+        except FileNotFoundError:
+            self.handle_error(file_name, "Файл не найден.")
+        except UnicodeDecodeError:
+            self.handle_error(file_name, "Ошибка декодирования.")
+        except Exception as e:
+            self.handle_error(file_name, str(e))
+        return None
+
+    def _count_mapped_file(self, file_name: str) -> Counter:
+        """Подсчет слов крупного файла через mmap: данные подгружаются ядром без копирования в str."""
+        counter: Counter = Counter()
+        with open(file_name, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if codecs.lookup(self.encoding).name in ('utf-8', 'ascii') and _NON_ASCII_RE.search(mapped) is None:
+                    # Чисто ASCII: токенизируем прямо по отображенному буферу, декодируя только сами слова
+                    counter.update(match.group(0).lower().decode('ascii')
+                                   for match in _ASCII_WORD_RE.finditer(mapped))
+                else:
+                    # Есть не-ASCII байты: декодируем буфер целиком и идем обычным путем
+                    text = mapped[:].decode(self.encoding)
+                    counter.update(self.text_processor._process_text_iter(text))
+        return counter
 
     def find(self, word: str) -> Dict[str, int]:
         """Поиск слова в файлах."""
-        return self.word_counter.count_word_occurrences(word)
+        return self.word_counter.count_word_occurrences(word.lower())
 
     def count_word_occurrences(self, word: str) -> Dict[str, int]:
         """Подсчет вхождений слова в файлах."""
-        return self.word_counter.count_word_occurrences(word)
+        return self.word_counter.count_word_occurrences(word.lower())
 
     def count_all_words(self) -> Dict[str, Counter]:
         """Получение всех слов и их количества из файлов."""
@@ -119,34 +323,13 @@ class FileWordsFinder(BaseWordsFinder):
     def filter_words(self, min_length: int = 0, starts_with: Optional[str] = None) -> Dict[str, List[str]]:
         """Фильтрация слов по минимальной длине и начальным символам."""
         filtered_words: Dict[str, List[str]] = {}
-        for file_name, counter in self.word_counter.get_all_words().items():
+        for file_name in self.word_counter.get_all_words():
             filtered_words[file_name] = [
-                word for word in counter if len(word) >= min_length and
-                                            (starts_with is None or word.startswith(starts_with))
+                word for word in self.word_counter.words_for_prefix(file_name, starts_with)
+                if len(word) >= min_length and (starts_with is None or word.startswith(starts_with))
             ]
         return filtered_words
 
-    def sort_results(self, all_word_counts: Dict[str, Counter], sort_by: str) -> Dict[str, Counter]:
-        """Сортировка результатов по частоте или в алфавитном порядке."""
-        if sort_by == 'frequency':
-            return dict(sorted(all_word_counts.items(), key=lambda item: sum(item[1].values()), reverse=True))
-        elif sort_by == 'alphabetical':
-            return dict(sorted(all_word_counts.items()))
-        return all_word_counts
-
-    def save_results(self, all_word_counts: Dict[str, Counter], output_file: str, format: str) -> None:
-        """Сохранение результатов в файл."""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            if format == 'json':
-                import json
-                json.dump(all_word_counts, f, ensure_ascii=False, indent=4)
-            else:
-                for file_name, counter in all_word_counts.items():
-                    f.write(f"{file_name}:\n")
-                    for word, count in counter.items():
-                        f.write(f"{word}: {count}\n")
-                    f.write("\n")
-
     def handle_error(self, file_name: str, error_message: str) -> None:
         """Обработка ошибок при работе с файлами."""
         logging.error(f"Ошибка при обработке файла {file_name}: {error_message}")
@@ -159,48 +342,30 @@ class InMemoryWordsFinder(BaseWordsFinder):
         self.process_text(text)
 
     def process_text(self, text: str) -> None:
-        words = self.text_processor._process_text(text)
-        self.word_counter.add_words("in_memory_text", words)
+        words = self.text_processor._process_text_iter(text)
+        self.word_counter.update_words("in_memory_text", words)
 
     def find(self, word: str) -> Dict[str, int]:
-        return self.word_counter.count_word_occurrences(word)
+        return self.word_counter.count_word_occurrences(word.lower())
 
     def count_word_occurrences(self, word: str) -> Dict[str, int]:
-        return self.word_counter.count_word_occurrences(word)
+        return self.word_counter.count_word_occurrences(word.lower())
 
     def count_all_words(self) -> Dict[str, Counter]:
         return self.word_counter.get_all_words()
 
     def filter_words(self, min_length: int = 0, starts_with: Optional[str] = None) -> Dict[str, List[str]]:
         filtered_words: Dict[str, List[str]] = {}
-        filtered_words["in_memory_text"] = [word for word in
-                                            self.word_counter.get_all_words().get("in_memory_text", Counter())
-                                            if len(word) >= min_length and
-                                            (starts_with is None or word.startswith(starts_with))]
+        filtered_words["in_memory_text"] = [
+            word for word in self.word_counter.words_for_prefix("in_memory_text", starts_with)
+            if len(word) >= min_length and (starts_with is None or word.startswith(starts_with))
+        ]
         return filtered_words
 
-    def sort_results(self, all_word_counts: Dict[str, Counter], sort_by: str) -> Dict[str, Counter]:
-        if sort_by == 'frequency':
-            return {k: v for k, v in
-                    sorted(all_word_counts.items(), key=lambda item: sum(item[1].values()), reverse=True)}
-        elif sort_by == 'alphabetical':
-            return dict(sorted(all_word_counts.items()))
-        return all_word_counts
-
-    def save_results(self, all_word_counts: Dict[str, Counter], output_file: str, format: str) -> None:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            if format == 'json':
-                import json
-                json.dump(all_word_counts, f, ensure_ascii=False, indent=4)
-            else:
-                for file_name, counter in all_word_counts.items():
-                    f.write(f"{file_name}:\n")
-                    for word, count in counter.items():
-                        f.write(f"{word}: {count}\n")
-                    f.write("\n")
-
 
 def main() -> None:
+    import argparse  # нужен только CLI, не библиотечным пользователям
+
     parser = argparse.ArgumentParser(description='Поиск и анализ слов в текстовых файлах.')
     parser.add_argument('files', nargs='*',
                         help='Список файлов для обработки (можно оставить пустым для обработки текста в памяти)')